@@ -1,5 +1,10 @@
+import csv
+import io
+import itertools
+import re
 import streamlit as st
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen only; skips interactive backend selection
 import numpy as np
 import pandas as pd
 from math import pi
@@ -11,6 +16,50 @@ st.set_page_config(
     layout="wide"
 )
 
+# Number of assessment themes (axes of the radar chart)
+N_THEMES = 9
+
+# Angle for each axis, with the first angle repeated to complete the circle
+_ANGLES = np.concatenate([np.linspace(0, 2 * np.pi, N_THEMES, endpoint=False), [0.0]])
+
+# Numbered radial labels as (angle, radius, text, color):
+# NGO capabilities in blue from the center outward, community capacities in green from the
+# outside inward, offset by half the angular spacing to avoid overlap
+_RADIAL_LABELS = (
+    [(0, i, str(i), '#1f77b4') for i in range(1, 11)]
+    + [(pi / N_THEMES, 10 - i + 1, str(i), '#2ca02c') for i in range(1, 11)]
+)
+
+# Strategic recommendations for each theme
+_STRATEGIC_RECOMMENDATIONS = {
+    '1.1 Awareness & Education': "improving communication on the effects of conservation, or reaching out to younger generations",
+    '1.2 Community Governance': "strengthening ties with community members to gain trust",
+    '1.3 Tradition Preservation': "collaborating with the community to include traditional elements in ecotourism",
+    '2.1 Income & Revenue': "adapting business model to increase the portion of the revenue reserved for tour guide salaries and conservation",
+    '2.2 Employment': "offer employment to more local residents with opportunities to develop skills and expertise",
+    '2.3 Amenities': "improve infrastructure for the daily lives of residents and adapt it to accommodate tourists",
+    '3.1 Habitat Conservation': "creating habitat improvements for the natural resource",
+    '3.2 Shark Preservation': "strengthening fishing conservation efforts",
+    '3.3 Protected Area': "strengthening and implementing area protection regulations"
+}
+
+# Recommendation keys normalized once and indexed by word, so each theme is matched
+# by lookup: exact name first, then a key contained in the name, then a shared word,
+# then a key word contained in the name (e.g. "shark" in "sharks").
+# Words are split on punctuation as well as spaces, and numbering such as "1.1" is left out.
+# The index is built in reverse so that the earliest key sharing a word wins.
+_NORMALIZED_RECOMMENDATIONS = {key.lower(): value for key, value in _STRATEGIC_RECOMMENDATIONS.items()}
+
+def _recommendation_words(name):
+    return [word for word in re.split(r'\W+', name) if word and not word.isdigit()]
+
+_RECOMMENDATION_WORD_INDEX = {
+    word: value
+    for key, value in reversed(list(_NORMALIZED_RECOMMENDATIONS.items()))
+    for word in _recommendation_words(key)
+}
+_RECOMMENDATION_KEY_WORDS = {key: _recommendation_words(key) for key in _NORMALIZED_RECOMMENDATIONS}
+
 def load_data_from_csv(uploaded_file):
     """
    
@@ -21,55 +70,62 @@ def load_data_from_csv(uploaded_file):
     - Column 2: Community capacity values
     - Column 3: NGO capability values
     First row can be headers (will be skipped)
+    Returns the theme names and the community capacity and NGO capability values as float arrays
     """
     try:
-        # Read CSV file
-        df = pd.read_csv(uploaded_file)
+        # Read only the first 10 non-blank records (optional header + 9 data rows); anything after
+        # them, such as a trailing notes line, is never parsed
+        reader = csv.reader(io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline=''))
+        rows = list(itertools.islice((row for row in reader if row), 10))
         
         # Check if we have at least 3 columns
-        if df.shape[1] < 3:
+        if not rows or len(rows[0]) < 3:
             st.error("Error: CSV file must have at least 3 columns (Theme, Community Capacity, NGO Capability)")
             return None, None, None
         
+        # Keep the first 3 columns; rows shorter than that (e.g. under a header with an extra Notes column) get empty cells
+        rows = [(row + ['', ''])[:3] for row in rows]
+        
         # Skip header row if it exists (check if first row contains non-numeric values in columns 2 and 3)
         start_row = 0
         try:
-            # Try to convert first row's second and third columns to float
-            pd.to_numeric(df.iloc[0, 1])
-            pd.to_numeric(df.iloc[0, 2])
-        except (ValueError, TypeError):
+            # Try to convert first row's second and third columns to float;
+            # empty cells are left to the range check below
+            for value in rows[0][1:3]:
+                if value.strip():
+                    float(value)
+        except ValueError:
             # First row is likely headers, skip it
             start_row = 1
         
         # Extract data from the appropriate rows
         end_row = start_row + 9
         
-        if df.shape[0] < end_row:
+        if len(rows) < end_row:
             st.error(f"Error: CSV file must have at least {9 + start_row} rows of data (including headers if present)")
             return None, None, None
         
-        themes = df.iloc[start_row:end_row, 0].tolist()  # Column 1
-        community_capacities = df.iloc[start_row:end_row, 1].tolist()  # Column 2
-        ngo_capabilities = df.iloc[start_row:end_row, 2].tolist()  # Column 3
-        
-        # Validate data length
-        if len(themes) != 9 or len(community_capacities) != 9 or len(ngo_capabilities) != 9:
-            st.error("Error: Expected exactly 9 rows of data")
-            return None, None, None
+        rows = rows[start_row:end_row]
+        themes = [row[0] for row in rows]  # Column 1
         
-        # Convert numeric values and validate
+        # Convert numeric values (columns 2 and 3) in one cast and validate;
+        # empty cells become NaN so the range check below reports them
         try:
-            community_capacities = [float(x) for x in community_capacities]
-            ngo_capabilities = [float(x) for x in ngo_capabilities]
+            values = np.char.strip(np.array([row[1:3] for row in rows]))
+            values = np.where(values == '', 'nan', values).astype(np.float64)
         except (ValueError, TypeError) as e:
             st.error(f"Error: All capacity values must be numeric. Found non-numeric value.")
             return None, None, None
         
-        # Check if values are within valid range (0-10)
-        for i, (comm_cap, ngo_cap) in enumerate(zip(community_capacities, ngo_capabilities)):
-            if not (0 <= comm_cap <= 10) or not (0 <= ngo_cap <= 10):
-                st.error(f"Error: Values in row {i + start_row + 1} are out of range. All values must be between 0 and 10.")
-                return None, None, None
+        # Check if values are within valid range (0-10); missing values count as out of range
+        out_of_range = ~((values >= 0) & (values <= 10))
+        if out_of_range.any():
+            i = int(out_of_range.any(axis=1).argmax())
+            st.error(f"Error: Values in row {i + start_row + 1} are out of range. All values must be between 0 and 10.")
+            return None, None, None
+        
+        community_capacities = values[:, 0]  # Column 2
+        ngo_capabilities = values[:, 1]  # Column 3
         
         return themes, community_capacities, ngo_capabilities
         
@@ -77,41 +133,84 @@ def load_data_from_csv(uploaded_file):
         st.error(f"Error reading CSV file: {str(e)}")
         return None, None, None
 
+@st.cache_data(show_spinner=False)
+def load_cached_data(file_bytes):
+    """
+    Load data from the contents of an uploaded CSV file, reusing the parsed result
+    on reruns while the same file stays uploaded
+    """
+    return load_data_from_csv(io.BytesIO(file_bytes))
+
+def find_recommendation(theme):
+    """
+    Find the strategic recommendation for a theme name from the uploaded file
+    """
+    theme_lower = theme.lower()
+    return (
+        _NORMALIZED_RECOMMENDATIONS.get(theme_lower)
+        or next((value for key, value in _NORMALIZED_RECOMMENDATIONS.items() if key in theme_lower), None)
+        or next((_RECOMMENDATION_WORD_INDEX[word] for word in _recommendation_words(theme_lower) if word in _RECOMMENDATION_WORD_INDEX), None)
+        or next((value for key, value in _NORMALIZED_RECOMMENDATIONS.items()
+                 if any(word in theme_lower for word in _RECOMMENDATION_KEY_WORDS[key])), None)
+        or "general strategic adjustments"
+    )
+
+def score_color(score):
+    """
+    Color a theme score: green for a fit, orange for overlap, red for a large gap, blue for a small gap
+    """
+    if score == 0:
+        color = 'green'
+    elif score > 0:
+        color = 'orange'
+    elif score < -2:
+        color = 'red'
+    else:  # -2 <= score < 0
+        color = 'blue'
+    return f'color: {color}; font-weight: bold'
+
 def create_radar_chart(ngo_capabilities, community_capacities, categories):
     """
     Create a radar chart comparing NGO capabilities with community capacities
     """
-    # Number of variables
-    N = len(categories)
+    # Imported here so the page can render before matplotlib's plotting stack has loaded
+    import matplotlib.pyplot as plt
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.colors import to_rgba
+    from matplotlib.patches import PathPatch
+    from matplotlib.path import Path
     
-    # Compute angle for each axis
-    angles = [n / float(N) * 2 * pi for n in range(N)]
-    angles += angles[:1]  # Complete the circle
+    angles = _ANGLES
     
-    # Add the first value to the end to close the radar chart
-    ngo_capabilities += ngo_capabilities[:1]
-    community_capacities += community_capacities[:1]
+    # Add the first value to the end to close the radar chart (on new arrays, so the inputs are never modified)
+    ngo = np.asarray(ngo_capabilities, dtype=np.float64)
+    ngo = np.append(ngo, ngo[0])
+    comm = np.asarray(community_capacities, dtype=np.float64)
+    comm = np.append(comm, comm[0])
     
     # Create the figure
     fig, ax = plt.subplots(figsize=(12, 12), subplot_kw=dict(projection='polar'))
     
     # NGO Capabilities (from center outward) - Blue
-    ax.plot(angles, ngo_capabilities, 'o-', linewidth=2, label='NGO Capability', color='#1f77b4')
-    ax.fill(angles, ngo_capabilities, alpha=0.25, color='#1f77b4')
+    ax.plot(angles, ngo, 'o-', linewidth=2, label='NGO Capability', color='#1f77b4')
+    ax.fill(angles, ngo, alpha=0.25, color='#1f77b4')
     
     # Community Capacities (from outside inward) - Green
     # Create the outer boundary (max ring) and fill inward based on capacity
     max_value = 10
-    community_outer = [max_value] * len(community_capacities)
-    community_fill_values = [max_value - val for val in community_capacities]
-    
-    # Plot the outer ring for community capacity
-    ax.plot(angles, community_outer, '-', linewidth=1, alpha=0.3, color='#2ca02c')
+    community_outer = np.full_like(comm, max_value)
+    community_fill_values = max_value - comm
     
-    # Fill from outer ring inward based on capacity values
-    # We create the filled area by plotting from max_value down to (max_value - capacity)
-    ax.fill_between(angles, community_outer, community_fill_values, 
-                   alpha=0.25, color='#2ca02c', label='Community Capacity')
+    # Fill from outer ring inward based on capacity values as a single patch:
+    # the outer ring and the inner boundary (max_value - capacity), drawn in opposite
+    # directions so only the band between them is filled. The patch edge draws the faint
+    # outer ring; the edge along the inner boundary is covered by the line plotted below
+    community_path = Path.make_compound_path(
+        Path(np.column_stack([angles, community_outer]), closed=True),
+        Path(np.column_stack([angles[::-1], community_fill_values[::-1]]), closed=True)
+    )
+    ax.add_patch(PathPatch(community_path, facecolor=to_rgba('#2ca02c', 0.25),
+                           edgecolor=to_rgba('#2ca02c', 0.3), linewidth=1, label='Community Capacity'))
     
     # Plot the inner boundary line for community capacity
     ax.plot(angles, community_fill_values, 'o-', linewidth=2, color='#2ca02c')
@@ -126,17 +225,11 @@ def create_radar_chart(ngo_capabilities, community_capacities, categories):
     ax.set_yticklabels([])  # Remove default labels
     ax.grid(True)
     
-    # Add custom numbered labels for NGO capabilities (blue, from center outward)
-    for i in range(1, 11):
-        ax.text(0, i, str(i), color='#1f77b4', fontweight='bold', 
-                ha='center', va='center', fontsize=8)
-    
-    # Add custom numbered labels for community capacities (green, from outside inward)
-    for i in range(1, 11):
-        # Position these at a different angle to avoid overlap
-        angle_offset = pi/N  # Offset by half the angular spacing
-        ax.text(angle_offset, 10-i+1, str(i), color='#2ca02c', fontweight='bold',
-                ha='center', va='center', fontsize=8)
+    # Add custom numbered labels for NGO capabilities and community capacities, sharing one font
+    label_font = FontProperties(weight='bold', size=8)
+    for angle, radius, label, color in _RADIAL_LABELS:
+        ax.text(angle, radius, label, color=color, fontproperties=label_font,
+                ha='center', va='center')
     
     # Add legend
     ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
@@ -147,6 +240,22 @@ def create_radar_chart(ngo_capabilities, community_capacities, categories):
     
     return fig
 
+@st.cache_data(show_spinner=False, max_entries=32)  # Bounded: the cache is shared by all sessions
+def create_radar_chart_png(ngo_capabilities, community_capacities, categories):
+    """
+    Render the radar chart to PNG bytes
+
+    Arguments are tuples so Streamlit can hash them; unchanged inputs reuse the
+    cached image instead of redrawing the chart on every rerun.
+    """
+    import matplotlib.pyplot as plt
+    
+    fig = create_radar_chart(ngo_capabilities, community_capacities, categories)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
 def main():
     st.title("🌊 Marine Conservation Community Assessment")
     st.markdown("### Evaluate the fit between NGO capabilities and community capacities")
@@ -184,16 +293,16 @@ def main():
     
     if uploaded_file is not None:
         # Load data from uploaded file
-        themes, community_capacities, ngo_capabilities = load_data_from_csv(uploaded_file)
+        themes, community_capacities, ngo_capabilities = load_cached_data(uploaded_file.getvalue())
         
         if themes is not None and community_capacities is not None and ngo_capabilities is not None:
             # Display loaded data in a preview table
             st.header("📊 Loaded Data Preview")
-            preview_df = pd.DataFrame({
-                'Theme': themes,
-                'Community Capacity': community_capacities,
-                'NGO Capability': ngo_capabilities
-            })
+            preview_df = pd.DataFrame(
+                np.column_stack([community_capacities, ngo_capabilities]),
+                columns=['Community Capacity', 'NGO Capability'],
+                index=themes
+            ).reset_index(names='Theme')
             st.dataframe(preview_df)
             
             # Create two columns for layout
@@ -212,8 +321,7 @@ def main():
                 st.header("Fit Assessment Visualization")
                 
                 # Create and display the radar chart
-                fig = create_radar_chart(ngo_capabilities.copy(), community_capacities.copy(), themes)
-                st.pyplot(fig)
+                st.image(create_radar_chart_png(tuple(ngo_capabilities), tuple(community_capacities), tuple(themes)), width='stretch')
                 
     
                
@@ -221,58 +329,31 @@ def main():
                 # Calculate and display scores for each theme
                 st.markdown("### Theme-by-Theme Assessment")
                 
-                # Define strategic recommendations for each theme
-                strategic_recommendations = {
-                    '1.1 Awareness & Education': "improving communication on the effects of conservation, or reaching out to younger generations",
-                    '1.2 Community Governance': "strengthening ties with community members to gain trust",
-                    '1.3 Tradition Preservation': "collaborating with the community to include traditional elements in ecotourism",
-                    '2.1 Income & Revenue': "adapting business model to increase the portion of the revenue reserved for tour guide salaries and conservation",
-                    '2.2 Employment': "offer employment to more local residents with opportunities to develop skills and expertise",
-                    '2.3 Amenities': "improve infrastructure for the daily lives of residents and adapt it to accommodate tourists",
-                    '3.1 Habitat Conservation': "creating habitat improvements for the natural resource",
-                    '3.2 Shark Preservation': "strengthening fishing conservation efforts",
-                    '3.3 Protected Area': "strengthening and implementing area protection regulations"
-                }
+                scores = np.asarray(ngo_capabilities) + np.asarray(community_capacities) - 10
+                
+                # Only look up recommendations for the themes with a small gap (-2 <= score < 0)
+                partial_gap = (scores < 0) & (scores >= -2)
+                partial_gap_comments = [
+                    f"There is a gap between the community context and the strategy of the NGO. This could potentially be solved by changing the strategy to include: {find_recommendation(theme)}"
+                    if is_partial_gap else ""
+                    for theme, is_partial_gap in zip(themes, partial_gap)
+                ]
+                comments = np.select(
+                    [scores == 0, scores > 0, scores < -2],
+                    [
+                        "Congratulations! On this theme, the project seems to be suitable for this community.",
+                        "The capacity and capability seems to overlap for this theme. The added benefit from the NGO's strategy may be negated. Strategic effort should be placed on other themes.",
+                        "There is a gap between the community context and the strategy of the NGO. It might be indicative of a bad fit.",
+                    ],
+                    default=partial_gap_comments  # -2 <= score < 0
+                )
                 
-                for i, theme in enumerate(themes):
-                    ngo_cap = ngo_capabilities[i]
-                    comm_cap = community_capacities[i]
-                    score = -10 + ngo_cap + comm_cap
-                    
-                    col_theme, col_score, col_comment = st.columns([2, 1, 3])
-                    
-                    with col_theme:
-                        st.markdown(f"**{theme}**")
-                    
-                    with col_score:
-                        if score == 0:
-                            st.markdown(f"<span style='color: green; font-weight: bold;'>{score}</span>", unsafe_allow_html=True)
-                        elif score > 0:
-                            st.markdown(f"<span style='color: orange; font-weight: bold;'>{score}</span>", unsafe_allow_html=True)
-                        elif score < -2:
-                            st.markdown(f"<span style='color: red; font-weight: bold;'>{score}</span>", unsafe_allow_html=True)
-                        else:  # -2 <= score < 0
-                            st.markdown(f"<span style='color: blue; font-weight: bold;'>{score}</span>", unsafe_allow_html=True)
-                    
-                    with col_comment:
-                        if score == 0:
-                            st.success("Congratulations! On this theme, the project seems to be suitable for this community.")
-                        elif score > 0:
-                            st.warning("The capacity and capability seems to overlap for this theme. The added benefit from the NGO's strategy may be negated. Strategic effort should be placed on other themes.")
-                        elif score < -2:
-                            st.error("There is a gap between the community context and the strategy of the NGO. It might be indicative of a bad fit.")
-                        else:  # -2 <= score < 0
-                            # Use the theme name from the uploaded file to find the recommendation
-                            recommendation = None
-                            for key, value in strategic_recommendations.items():
-                                if key.lower() in theme.lower() or any(word in theme.lower() for word in key.lower().split()):
-                                    recommendation = value
-                                    break
-                            
-                            if recommendation is None:
-                                recommendation = "general strategic adjustments"
-                            
-                            st.info(f"There is a gap between the community context and the strategy of the NGO. This could potentially be solved by changing the strategy to include: {recommendation}")
+                assessment_df = pd.DataFrame({'Theme': themes, 'Score': scores, 'Comment': comments})
+                st.dataframe(
+                    assessment_df.style.map(score_color, subset=['Score']).format(precision=1, subset=['Score']),
+                    hide_index=True,
+                    column_config={'Comment': st.column_config.TextColumn(width='large')}
+                )
                 
                 # Calculate overall assessment
                 #all_scores = [-10 + ngo_capabilities[i] + community_capacities[i] for i in range(len(themes))]
@@ -1,7 +1,12 @@
+import io
 import streamlit as st
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen only; skips interactive backend selection
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
 import numpy as np
-from math import pi
 
 # Configure the Streamlit page
 st.set_page_config(
@@ -9,41 +14,63 @@ st.set_page_config(
     layout="wide"
 )
 
+# Number of assessment themes (axes of the radar chart)
+N_THEMES = 9
+
+# Angle for each axis, with the first angle repeated to complete the circle
+_ANGLES = np.concatenate([np.linspace(0, 2 * np.pi, N_THEMES, endpoint=False), [0.0]])
+
+# Define the sustainability themes
+_THEMES = (
+    'Generational Development',
+    'Community Cohesion',
+    'Tradition Preservation',
+    'Infrastructure',
+    'Employment',
+    'Revenue',
+    'Habitat Conservation',
+    'Shark Population',
+    'Protected Land'
+)
+
+# Define constant NGO capabilities (you can adjust these values)
+_NGO_CAPABILITIES = (5, 4, 5, 3, 4, 2, 4, 6, 6)  # Example values
+
 def create_radar_chart(ngo_capabilities, community_capacities, categories):
     """
     Create a radar chart comparing NGO capabilities with community capacities
     """
-    # Number of variables
-    N = len(categories)
-    
-    # Compute angle for each axis
-    angles = [n / float(N) * 2 * pi for n in range(N)]
-    angles += angles[:1]  # Complete the circle
+    angles = _ANGLES
     
-    # Add the first value to the end to close the radar chart
-    ngo_capabilities += ngo_capabilities[:1]
-    community_capacities += community_capacities[:1]
+    # Add the first value to the end to close the radar chart (on new arrays, so the inputs are never modified)
+    ngo = np.asarray(ngo_capabilities, dtype=np.float64)
+    ngo = np.append(ngo, ngo[0])
+    comm = np.asarray(community_capacities, dtype=np.float64)
+    comm = np.append(comm, comm[0])
     
     # Create the figure
     fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'))
     
     # NGO Capabilities (from center outward) - Blue
-    ax.plot(angles, ngo_capabilities, 'o-', linewidth=2, label='NGO Capability', color='#1f77b4')
-    ax.fill(angles, ngo_capabilities, alpha=0.25, color='#1f77b4')
+    ax.plot(angles, ngo, 'o-', linewidth=2, label='NGO Capability', color='#1f77b4')
+    ax.fill(angles, ngo, alpha=0.25, color='#1f77b4')
     
     # Community Capacities (from outside inward) - Green
     # Create the outer boundary (max ring) and fill inward based on capacity
     max_value = 10
-    community_outer = [max_value] * len(community_capacities)
-    community_fill_values = [max_value - val for val in community_capacities]
-    
-    # Plot the outer ring for community capacity
-    ax.plot(angles, community_outer, '-', linewidth=1, alpha=0.3, color='#2ca02c')
-    
-    # Fill from outer ring inward based on capacity values
-    # We create the filled area by plotting from max_value down to (max_value - capacity)
-    ax.fill_between(angles, community_outer, community_fill_values, 
-                   alpha=0.25, color='#2ca02c', label='Community Capacity')
+    community_outer = np.full_like(comm, max_value)
+    community_fill_values = max_value - comm
+    
+    # Fill from outer ring inward based on capacity values as a single patch:
+    # the outer ring and the inner boundary (max_value - capacity), drawn in opposite
+    # directions so only the band between them is filled. The patch edge draws the faint
+    # outer ring; the edge along the inner boundary is covered by the line plotted below
+    community_path = Path.make_compound_path(
+        Path(np.column_stack([angles, community_outer]), closed=True),
+        Path(np.column_stack([angles[::-1], community_fill_values[::-1]]), closed=True)
+    )
+    ax.add_patch(PathPatch(community_path, facecolor=to_rgba('#2ca02c', 0.25),
+                           edgecolor=to_rgba('#2ca02c', 0.3), linewidth=1, label='Community Capacity'))
     
     # Plot the inner boundary line for community capacity
     ax.plot(angles, community_fill_values, 'o-', linewidth=2, color='#2ca02c')
@@ -67,26 +94,32 @@ def create_radar_chart(ngo_capabilities, community_capacities, categories):
     
     return fig
 
-def main():
-    st.title(" Marine Conservation Community Assessment")
-    st.markdown("### Evaluate the fit between NGO capabilities and community capacities")
-    
-    # Define the sustainability themes
-    themes = [
-        'Generational Development',
-        'Community Cohesion', 
-        'Tradition Preservation',
-        'Infrastructure',
-        'Employment',
-        'Revenue',
-        'Habitat Conservation',
-        'Shark Population',
-        'Protected Land'
-    ]
-    
-    # Define constant NGO capabilities (you can adjust these values)
-    ngo_capabilities = [5, 4, 5, 3, 4, 2, 4, 6, 6]  # Example values
-    
+@st.cache_data(show_spinner=False, max_entries=32)  # Bounded: the cache is shared by all sessions
+def create_radar_chart_png(ngo_capabilities, community_capacities, categories):
+    """
+    Render the radar chart to PNG bytes
+
+    Arguments are tuples so Streamlit can hash them; unchanged inputs reuse the
+    cached image instead of redrawing the chart on every rerun.
+    """
+    fig = create_radar_chart(ngo_capabilities, community_capacities, categories)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+def compute_fit_scores(ngo_capabilities, community_capacities):
+    """
+    Calculate how well NGO capabilities and community capacities complement each other per theme
+    """
+    # Higher scores when both are high or when they balance each other
+    return np.minimum(ngo_capabilities, community_capacities) + np.abs(ngo_capabilities - community_capacities) * 0.1
+
+@st.fragment
+def render_assessment():
+    """
+    Render the sliders, radar chart and fit score; moving a slider reruns only this fragment
+    """
     # Create two columns
     col1, col2 = st.columns([1, 2])
     
@@ -97,7 +130,7 @@ def main():
         # Create sliders for community capacities
         community_capacities = []
         
-        for i, theme in enumerate(themes):
+        for i, theme in enumerate(_THEMES):
             capacity = st.slider(
                 f"{theme}",
                 min_value=0,
@@ -112,15 +145,14 @@ def main():
         st.header("NGO Capabilities")
         st.markdown("*These represent the organization's established strengths:*")
         
-        for i, (theme, capability) in enumerate(zip(themes, ngo_capabilities)):
+        for i, (theme, capability) in enumerate(zip(_THEMES, _NGO_CAPABILITIES)):
             st.markdown(f"**{theme}:** {capability}/10")
     
     with col2:
         st.header("Fit Assessment Visualization")
         
         # Create and display the radar chart
-        fig = create_radar_chart(ngo_capabilities.copy(), community_capacities.copy(), themes)
-        st.pyplot(fig)
+        st.image(create_radar_chart_png(_NGO_CAPABILITIES, tuple(community_capacities), _THEMES), width='stretch')
         
         # Add interpretation
         st.markdown("### Interpretation Guide")
@@ -132,14 +164,10 @@ def main():
         """)
         
         # Calculate and display fit score
-        fit_scores = []
-        for ngo_cap, comm_cap in zip(ngo_capabilities[:-1], community_capacities):  # Exclude duplicate first element
-            # Calculate how well they complement each other
-            # Higher scores when both are high or when they balance each other
-            fit_score = min(ngo_cap, comm_cap) + (abs(ngo_cap - comm_cap) * 0.1)
-            fit_scores.append(fit_score)
-        
-        overall_fit = np.mean(fit_scores)
+        overall_fit = compute_fit_scores(
+            np.asarray(_NGO_CAPABILITIES, dtype=np.float64),
+            np.asarray(community_capacities, dtype=np.float64)
+        ).mean()
         
         st.metric(
             label="Overall Fit Score", 
@@ -155,5 +183,11 @@ def main():
         else:
             st.error("⚠️ Limited fit. This community may require significant preliminary work or alternative approaches.")
 
+def main():
+    st.title(" Marine Conservation Community Assessment")
+    st.markdown("### Evaluate the fit between NGO capabilities and community capacities")
+    
+    render_assessment()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file